@@ -4,23 +4,28 @@ try:
 except ImportError:
     pass
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 import Rhino.Geometry as geo  # type: ignore
 import scriptcontext as sc  # type: ignore
 import Rhino  # type: ignore
-import ghpythonlib.components as ghcomp  # type: ignore
 import utils
 
-# 모듈 새로고침
+# 모듈 새로고침 (개발 중에만. GH 인풋 dev_reload로 켠다)
 import importlib
 
-importlib.reload(utils)
+if globals().get("dev_reload"):
+    importlib.reload(utils)
 
 
 class Lot:
     def __init__(self, region: geo.Curve, district_use: str) -> None:
         self.region = region
         self.district_use = district_use
-        self.area = geo.AreaMassProperties.Compute(region).Area
+        self.area = utils.get_area(region)
 
 
 class Road:
@@ -31,9 +36,7 @@ class Road:
 class Building:
     def __init__(self, regions: List[geo.Curve], floor_count: int, use: str) -> None:
         self.regions = regions
-        self.floor_area = sum(
-            geo.AreaMassProperties.Compute(region).Area for region in regions
-        )
+        self.floor_area = sum(utils.get_area(region) for region in regions)
         self.floor_count = floor_count
         self.total_area = self.floor_area * floor_count
         self.use = use
@@ -96,9 +99,50 @@ class OepnspaceGenerator:
         self.building = building
         self.parking_region = parking_region
         self.requirement = requirement
+        # 후보 지역 생성/필터링에 재사용하는 값들. _prepare에서 한 번만 계산한다.
+        self._prepared = False
+        self._lot_road_overlap = []  # type: List[float]
+        self._road_rtree = None  # type: Optional[geo.RTree]
+        self._inward_inputs = []  # type: List[geo.Curve]
+        self._lot_bbox = None  # type: Optional[geo.BoundingBox]
+        self._building_rtree = None  # type: Optional[geo.RTree]
+        # 커브별 면적 캐시. id 재사용을 막기 위해 커브도 함께 보관한다.
+        self._area_cache = {}  # type: Dict[int, Tuple[geo.Curve, float]]
+
+    def _prepare(self) -> None:
+        """후보 지역 생성/필터링에 필요한 값들을 처음 필요할 때 한 번만 계산한다.
+        공개공지 설치 대상이 아닌 경우 계산하지 않도록 __init__에서 분리했다.
+        """
+        if self._prepared:
+            return
+        # 대지와 도로의 접한 길이는 후보 지역과 무관하므로 미리 계산한다.
+        self._lot_road_overlap = [
+            utils.get_overlap_length(self.lot.region, road.curve) for road in self.roads
+        ]
+        self._road_rtree = utils.get_rtree([road.curve for road in self.roads])
+        # 후보 지역 생성에 쓰는 offset 인풋과 빌딩영역 RTree도 재사용한다.
+        self._inward_inputs = [
+            self.lot.region,
+            self.parking_region,
+        ] + self.building.regions
+        self._lot_bbox = self.lot.region.GetBoundingBox(True)
+        self._building_rtree = utils.get_rtree(self.building.regions)
+        self._prepared = True
+
+    def _area(self, region: geo.Curve) -> float:
+        """영역 커브의 면적을 한 번만 계산하고 재사용한다."""
+        cached = self._area_cache.get(id(region))
+        if cached is None:
+            cached = (region, utils.get_area(region))
+            self._area_cache[id(region)] = cached
+        return cached[1]
 
     def get_openspace(self) -> List[geo.Curve]:
         # 공개공지 생성 로직
+        # 0. 공개공지 설치 대상이 아니면 생성하지 않는다.
+        if self.requirement.area <= 0:
+            return []
+
         # 1. 후보 지역 생성
         candidates = self.get_candidate_regions()
 
@@ -115,19 +159,31 @@ class OepnspaceGenerator:
 
     def get_candidate_regions(self) -> List[geo.Curve]:
         """공개공지 최소 조건을 만족하는 영역 생성"""
+        self._prepare()
+
         # 최소 폭 조거늘 만족하는 영역 확보
         # 오프셋 in and out 을 통해 확보
+        # 대지의 bounding box가 최소 폭보다 좁으면 offset 없이 후보가 없다.
+        if (
+            self._lot_bbox.Diagonal.X <= self.requirement.MIN_DEPTH
+            or self._lot_bbox.Diagonal.Y <= self.requirement.MIN_DEPTH
+        ):
+            return []
+
         inward_regions = utils.offset_regions_inward(
-            [self.lot.region, self.parking_region] + self.building.regions,
+            self._inward_inputs,
             self.requirement.MIN_DEPTH / 2,
         )
 
-        # 빌딩영역과 교차가 있는 경우 필터링 geo.Curve.PlanarCurveCollision 사용
+        # 빌딩영역과 교차가 있는 경우 필터링 geo.Curve.PlanarClosedCurveRelationship 사용
+        # bounding box가 겹치는 빌딩영역만 RTree로 찾아 정밀 판정한다.
         filtered_inward_regions = []
         for region in inward_regions:
             if any(
-                utils.has_region_intersection(region, other_region)
-                for other_region in self.building.regions
+                utils.has_region_intersection(
+                    region, self.building.regions[i], use_bbox_filter=False
+                )
+                for i in utils.search_rtree(self._building_rtree, region)
             ):
                 continue
             filtered_inward_regions.append(region)
@@ -140,67 +196,81 @@ class OepnspaceGenerator:
 
     def filter_candidate_regions(self, candidates: List[geo.Curve]) -> List[geo.Curve]:
         """후보 지역 필터링"""
+        self._prepare()
+
+        # 도로별 최소 접촉 길이는 후보 지역과 무관하므로 한 번만 계산한다.
+        thresholds = [
+            overlap_length * self.requirement.ROAD_ADJUST_RATIO
+            for overlap_length in self._lot_road_overlap
+        ]
 
         def is_road_adjacent(candidate: geo.Curve) -> bool:
             # 도로와 후보 지역의 접촉 여부 확인
-            for road in self.roads:
-                candidate_overlap_length = utils.get_overlap_length(
-                    candidate, road.curve
-                )
-                lot_overlap_length = utils.get_overlap_length(
-                    self.lot.region, road.curve
-                )
-                if (
-                    candidate_overlap_length
-                    > lot_overlap_length * self.requirement.ROAD_ADJUST_RATIO
-                ):
-                    return True
-
-            return False
-
-        # 도로와 4분의 1 이상 접하는 후보 지역 필터링
-        filtered_candidates = filter(lambda x: is_road_adjacent(x), candidates)
-
-        # 공개공지 면적 조건 필터링
-        filtered_candidates = filter(
-            lambda x: geo.AreaMassProperties.Compute(x).Area
-            >= self.requirement.MIN_AREA,
-            filtered_candidates,
-        )
+            # bounding box가 겹치는 도로만 확인한다.
+            return any(
+                utils.get_overlap_length(candidate, self.roads[i].curve) > thresholds[i]
+                for i in utils.search_rtree(self._road_rtree, candidate)
+            )
 
-        return list(filtered_candidates)
+        # 1. 공개공지 면적 조건 (캐시된 면적이라 먼저 확인)
+        # 2. 도로와 4분의 1 이상 접하는 후보 지역
+        return [
+            candidate
+            for candidate in candidates
+            if self._area(candidate) >= self.requirement.MIN_AREA
+            and is_road_adjacent(candidate)
+        ]
 
     def sort_candidate_regions(self, candidates: List[geo.Curve]) -> List[geo.Curve]:
         # 후보 지역 정렬 로직
-        sorted_candidates = sorted(
-            candidates,
-            key=lambda x: geo.AreaMassProperties.Compute(x).Area,
-            reverse=True,
-        )
-        return sorted_candidates
+        # 면적은 후보 지역마다 한 번만 계산한다.
+        if np is not None:
+            areas = np.fromiter(
+                (self._area(candidate) for candidate in candidates),
+                dtype=np.float64,
+                count=len(candidates),
+            )
+            order = np.argsort(-areas, kind="stable")
+            return [candidates[i] for i in order]
+
+        pairs = [(self._area(candidate), candidate) for candidate in candidates]
+        sorted_pairs = sorted(pairs, key=lambda pair: -pair[0])
+        return [candidate for _, candidate in sorted_pairs]
 
     def adjust_candidate_regions(self, candidates: List[geo.Curve]) -> List[geo.Curve]:
         # 후보 지역 조정 로직
         def reduce_region(region: geo.Curve, target_area: float) -> geo.Curve:
             # 후보 지역을 목표 면적에 맞게 조정
-            region = region.Duplicate()
-            area = geo.AreaMassProperties.Compute(region).Area
+            area = self._area(region)
             if area <= target_area:
                 return region
             scale_factor = (target_area / area) ** 0.5
-            center_of_scale = utils.get_overlap_crv(region, self.lot.region)[0].PointAt(
-                0.5
+            # 후보 지역 경계 중 대지 경계와 겹치는 선분 위에 축소 중심점을 둔다.
+            # 겹치는 선분이 없으면 무게중심을 기준으로 축소한다.
+            centroid = geo.AreaMassProperties.Compute(region).Centroid
+            center_of_scale = utils.get_closest_point_on_crvs(
+                centroid, utils.get_segments_on_crv(region, self.lot.region)
+            )
+            if center_of_scale is None:
+                center_of_scale = centroid
+            xform = geo.Transform.Scale(
+                geo.Plane(center_of_scale, geo.Vector3d.ZAxis),
+                scale_factor,
+                scale_factor,
+                1.0,
             )
-            return ghcomp.Scale(region, center_of_scale, scale_factor).geometry
+            region = region.DuplicateCurve()
+            region.Transform(xform)
+            return region
 
         adjusted_candidates = []
         total_area = 0.0
         # 후보 영역을 목표 면적에 도달할때 까지 확보
         for candidate in candidates:
-            area = geo.AreaMassProperties.Compute(candidate).Area
+            area = self._area(candidate)
             if total_area + area > self.requirement.area:
                 candidate = reduce_region(candidate, self.requirement.area - total_area)
-                area = geo.AreaMassProperties.Compute(candidate).Area
+                area = self._area(candidate)
 
             adjusted_candidates.append(candidate)
             total_area += area
@@ -225,9 +295,7 @@ openspace_generator = OepnspaceGenerator(
 
 openspace_regions = openspace_generator.get_openspace()
 
-openspace_area = sum(
-    geo.AreaMassProperties.Compute(region).Area for region in openspace_regions
-)
+openspace_area = sum(utils.get_area(region) for region in openspace_regions)
 print(f"Total Openspace Area: {openspace_area} m2")
 print(f"Lot Area: {lot.area} m2")
 print(f"Building Area: {building.total_area} m2")
@@ -0,0 +1,18 @@
+# -*- coding:utf-8 -*-
+import importlib
+import os
+import sys
+from unittest import mock
+
+# 저장소 루트의 utils 모듈을 import 할 수 있도록 경로를 추가한다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Rhino/Grasshopper 밖에서는 utils의 import만 통과하도록 빈 모듈을 채운다.
+# Rhino 객체를 쓰지 않는 순수 계산 함수만 테스트할 수 있다.
+try:
+    importlib.import_module("Rhino.Geometry")
+    importlib.import_module("ghpythonlib.components")
+except ImportError:
+    for package, module in (("Rhino", "Geometry"), ("ghpythonlib", "components")):
+        sys.modules[package] = mock.MagicMock()
+        sys.modules[package + "." + module] = getattr(sys.modules[package], module)
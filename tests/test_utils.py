@@ -0,0 +1,67 @@
+# -*- coding:utf-8 -*-
+import collections
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import utils
+
+# get_polyline_overlap_length는 점의 X, Y만 읽는다.
+Point = collections.namedtuple("Point", ("X", "Y"))
+
+
+def make_polyline(pts):
+    return [Point(x, y) for x, y in pts]
+
+
+SQUARE = make_polyline([(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)])
+
+
+@pytest.mark.parametrize(
+    ("polyline_a", "polyline_b", "expected"),
+    [
+        # 부분적으로 겹치는 경우
+        (SQUARE, make_polyline([(-5, 0), (4, 0)]), 4.0),
+        (make_polyline([(-5, 0), (4, 0)]), SQUARE, 4.0),
+        # 떨어져 있는 경우
+        (SQUARE, make_polyline([(12, -3), (12, 20)]), 0.0),
+        # 수직으로 만나는 경우
+        (SQUARE, make_polyline([(5, 0), (5, -10)]), 0.0),
+        # 여러 선분 중 하나만 겹치는 경우
+        (SQUARE, make_polyline([(10, 20), (10, 5), (3, 0.0005)]), 5.0),
+    ],
+)
+def test_polyline_overlap_length(polyline_a, polyline_b, expected):
+    length = utils.get_polyline_overlap_length(polyline_a, polyline_b)
+
+    assert length == pytest.approx(expected, abs=utils.TOL)
+
+
+def test_polyline_overlap_length_slightly_skewed_edge():
+    # 긴 도로 경계와 아주 작은 각도로 어긋난 짧은 후보 경계
+    candidate = make_polyline([(0, 0), (10, 0.0005), (10, 10), (0, 10), (0, 0)])
+    road = make_polyline([(-100, 0), (100, 0)])
+
+    length = utils.get_polyline_overlap_length(candidate, road)
+
+    assert length == pytest.approx(10.0, abs=utils.TOL)
+
+
+def test_polyline_overlap_length_counts_overlapping_b_segments_once():
+    edge = make_polyline([(0, 0), (10, 0)])
+    back_and_forth = make_polyline([(0, 0), (10, 0), (0, 0)])
+
+    length = utils.get_polyline_overlap_length(edge, back_and_forth)
+
+    assert length == pytest.approx(10.0)
+
+
+def test_polyline_overlap_length_ignores_shallow_crossing():
+    # 가운데 1m 구간만 tol 이내인 교차는 겹침으로 보지 않는다.
+    edge = make_polyline([(0, 0), (10, 0)])
+    crossing = make_polyline([(0, -0.01), (10, 0.01)])
+
+    length = utils.get_polyline_overlap_length(edge, crossing)
+
+    assert length == 0.0
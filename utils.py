@@ -3,9 +3,11 @@ try:
     from typing import List, Tuple, Dict, Any, Optional, Union
 except ImportError:
     pass
-import functools
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-import Rhino
 import Rhino.Geometry as geo  # ignore
 import ghpythonlib.components as ghcomp  # ignore
 
@@ -18,6 +20,148 @@ OP_TOL = 0.00001
 CLIPPER_TOL = 0.0000000001
 
 
+def get_area(region: geo.Curve) -> float:
+    """영역 커브의 면적을 구한다.
+    폴리라인이면 numpy로 신발끈 공식을 사용하고, 아니면 AreaMassProperties를 사용한다.
+    Args:
+        region : 닫힌 영역 커브
+
+    Returns:
+        면적
+    """
+    if np is not None:
+        is_polyline, polyline = region.TryGetPolyline()
+        if is_polyline and polyline.IsClosed:
+            pts = np.asarray([(pt.X, pt.Y) for pt in polyline], dtype=np.float64)
+            xs, ys = pts[:, 0], pts[:, 1]
+            return 0.5 * abs(
+                float(np.dot(xs, np.roll(ys, -1)) - np.dot(ys, np.roll(xs, -1)))
+            )
+    return geo.AreaMassProperties.Compute(region).Area
+
+
+def get_bbox(crv: geo.Curve) -> Tuple[float, float, float, float]:
+    """커브의 XY 평면 bounding box를 구한다.
+    Args:
+        crv : bounding box를 구할 커브
+
+    Returns:
+        (min_x, min_y, max_x, max_y)
+    """
+    bbox = crv.GetBoundingBox(True)
+    return (bbox.Min.X, bbox.Min.Y, bbox.Max.X, bbox.Max.Y)
+
+
+def is_bbox_disjoint(
+    bbox_a: Tuple[float, float, float, float],
+    bbox_b: Tuple[float, float, float, float],
+    tol: float = TOL,
+) -> bool:
+    """두 bounding box가 tol 이상 떨어져 있는지 확인한다.
+    정밀한 교차 판정 전에 빠르게 걸러내기 위해 사용한다.
+    Args:
+        bbox_a : get_bbox로 구한 bounding box
+        bbox_b : get_bbox로 구한 bounding box
+        tol: tolerance
+
+    Returns:
+        bool: 떨어져 있는지 여부
+    """
+    return (
+        bbox_a[2] < bbox_b[0] - tol
+        or bbox_b[2] < bbox_a[0] - tol
+        or bbox_a[3] < bbox_b[1] - tol
+        or bbox_b[3] < bbox_a[1] - tol
+    )
+
+
+def get_rtree(crvs: List[geo.Curve]) -> geo.RTree:
+    """커브들의 bounding box로 RTree를 만든다.
+    커브의 인덱스를 RTree의 id로 사용한다.
+    Args:
+        crvs : RTree에 넣을 커브 리스트
+
+    Returns:
+        RTree
+    """
+    rtree = geo.RTree()
+    for i, crv in enumerate(crvs):
+        rtree.Insert(crv.GetBoundingBox(True), i)
+    return rtree
+
+
+def search_rtree(rtree: geo.RTree, crv: geo.Curve, tol: float = TOL) -> List[int]:
+    """커브의 bounding box와 겹치는 RTree 항목의 인덱스를 구한다.
+    XY 평면 기준으로 판정하기 위해 Z 방향은 충분히 넓게 검색한다.
+    Args:
+        rtree : get_rtree로 만든 RTree
+        crv : 검색할 커브
+        tol: tolerance
+
+    Returns:
+        겹치는 항목의 인덱스 리스트 (오름차순)
+    """
+    min_x, min_y, max_x, max_y = get_bbox(crv)
+    search_bbox = geo.BoundingBox(
+        min_x - tol, min_y - tol, -BIGNUM, max_x + tol, max_y + tol, BIGNUM
+    )
+    hits = []  # type: List[int]
+    rtree.Search(search_bbox, lambda sender, e: hits.append(e.Id))
+    return sorted(hits)
+
+
+def get_segments_on_crv(
+    crv: geo.Curve, other_crv: geo.Curve, tol: float = DIST_TOL
+) -> List[geo.Curve]:
+    """crv의 선분 중 other_crv 위에 놓인 선분들을 구한다.
+    선분의 양 끝점과 중점이 모두 other_crv에서 tol 이내이면 놓인 것으로 본다.
+    Args:
+        crv : 선분으로 나눌 커브
+        other_crv : 선분이 놓였는지 테스트할 커브
+        tol: tolerance
+
+    Returns:
+        other_crv 위에 놓인 crv의 선분 리스트
+    """
+
+    def is_on_other_crv(pt: geo.Point3d) -> bool:
+        _, t = other_crv.ClosestPoint(pt)
+        return pt.DistanceTo(other_crv.PointAt(t)) <= tol
+
+    return [
+        seg
+        for seg in crv.DuplicateSegments()
+        if all(
+            is_on_other_crv(pt)
+            for pt in (
+                seg.PointAtStart,
+                seg.PointAtNormalizedLength(0.5),
+                seg.PointAtEnd,
+            )
+        )
+    ]
+
+
+def get_closest_point_on_crvs(
+    pt: geo.Point3d, crvs: List[geo.Curve]
+) -> Optional[geo.Point3d]:
+    """커브들 위에서 pt와 가장 가까운 점을 구한다.
+    Args:
+        pt : 기준 점
+        crvs : 대상 커브 리스트
+
+    Returns:
+        가장 가까운 점. 커브가 없으면 None
+    """
+    closest_pts = []
+    for crv in crvs:
+        _, t = crv.ClosestPoint(pt)
+        closest_pts.append(crv.PointAt(t))
+    if not closest_pts:
+        return None
+    return min(closest_pts, key=lambda closest_pt: pt.DistanceTo(closest_pt))
+
+
 def get_overlap_crv(crv_a: geo.Curve, crv_b: geo.Curve) -> List[geo.Curve]:
     """두 커브의 겹치는 구간을 구한다.
     Args:
@@ -27,26 +171,22 @@ def get_overlap_crv(crv_a: geo.Curve, crv_b: geo.Curve) -> List[geo.Curve]:
     Returns:
         crv_a를 기준으로 crv_b와 겹치는 부분 커브
     """
-    # 두 커브가 교차조차 없으면 겹치는 부분이 없다.
-    if not geo.Curve.PlanarCurveCollision(crv_a, crv_b, geo.Plane.WorldXY, TOL):
+    # 두 커브의 bounding box가 떨어져 있으면 겹치는 부분이 없다.
+    if is_bbox_disjoint(get_bbox(crv_a), get_bbox(crv_b)):
         return []
 
-    # crv_a와 crv_b의 교차점 + crv_a의 꼭짓점들로 crv_a를 자른다.
-    pts_to_split = (
-        ghcomp.Explode(crv_a, True).vertices + ghcomp.CurveXCurve(crv_a, crv_b).points
-    )
-    if not pts_to_split:
+    # crv_a와 crv_b의 겹침 구간을 crv_a의 파라미터 구간으로 바로 구한다.
+    events = geo.Intersect.Intersection.CurveCurve(crv_a, crv_b, TOL, TOL)
+    if not events:
         return []
 
-    parameters = [ghcomp.CurveClosestPoint(pt, crv_a).parameter for pt in pts_to_split]
-
-    segments = ghcomp.Shatter(crv_a, parameters)
-
-    overlaped_segments = [
-        seg
-        for seg in segments
-        if geo.Curve.PlanarCurveCollision(seg, crv_b, geo.Plane.WorldXY, TOL)
-    ]
+    overlaped_segments = []
+    for event in events:
+        if not event.IsOverlap:
+            continue
+        segment = crv_a.Trim(event.OverlapA.T0, event.OverlapA.T1)
+        if segment is not None:
+            overlaped_segments.append(segment)
 
     if not overlaped_segments:
         return []
@@ -63,35 +203,128 @@ def get_overlap_length(crv_a: geo.Curve, crv_b: geo.Curve) -> float:
     Returns:
         crv_a를 기준으로 crv_b와 겹치는 부분 길이
     """
-    overlap_crvs = get_overlap_crv(crv_a, crv_b)
-    if not overlap_crvs:
+    # 두 커브 모두 폴리라인이면 선분끼리의 겹침 구간을 numpy로 바로 계산한다.
+    if np is not None:
+        is_polyline_a, polyline_a = crv_a.TryGetPolyline()
+        is_polyline_b, polyline_b = crv_b.TryGetPolyline()
+        if is_polyline_a and is_polyline_b:
+            return get_polyline_overlap_length(polyline_a, polyline_b)
+
+    return sum(crv.GetLength() for crv in get_overlap_crv(crv_a, crv_b))
+
+
+def get_polyline_overlap_length(
+    polyline_a: geo.Polyline, polyline_b: geo.Polyline, tol: float = TOL
+) -> float:
+    """두 폴리라인의 겹치는 길이를 선분 단위로 구한다. numpy가 필요하다.
+    a 선분 위로 잘린 b 선분 구간의 양 끝이 모두 a 직선에서 tol 이내여야 겹친 것으로 본다.
+    작은 각도로 a 선분을 가로지르는 b 선분은 일부 구간이 tol 이내여도 겹치지 않은 것으로 본다.
+    Args:
+        polyline_a : polyline_b와 겹치는 부분을 구할 폴리라인
+        polyline_b : polyline_a와 겹치짐을 테스트할 폴리라인
+        tol: 같은 직선 위에 있다고 볼 거리
+
+    Returns:
+        polyline_a를 기준으로 polyline_b와 겹치는 부분 길이
+    """
+    pts_a = np.asarray([(pt.X, pt.Y) for pt in polyline_a], dtype=np.float64)
+    pts_b = np.asarray([(pt.X, pt.Y) for pt in polyline_b], dtype=np.float64)
+    if len(pts_a) < 2 or len(pts_b) < 2:
         return 0.0
 
-    length = 0.0
-    for crv in overlap_crvs:
-        length += crv.GetLength()
-    return length
+    # a 선분: (na, 2), b 선분 시작/끝: (nb, 2)
+    start_a = pts_a[:-1]
+    vec_a = pts_a[1:] - start_a
+    len_a = np.hypot(vec_a[:, 0], vec_a[:, 1])
+    valid = len_a > tol
+    start_a, vec_a, len_a = start_a[valid], vec_a[valid], len_a[valid]
+    if not len(len_a):
+        return 0.0
+    dir_a = vec_a / len_a[:, None]
+
+    # b 선분 끝점을 a 선분 좌표계로 옮긴다: (na, nb, 2)
+    rel_start = pts_b[None, :-1, :] - start_a[:, None, :]
+    rel_end = pts_b[None, 1:, :] - start_a[:, None, :]
+
+    # a 선분 방향으로의 투영(t)과 a 선분 직선으로부터의 거리(d)
+    t_start = (
+        dir_a[:, None, 0] * rel_start[..., 0] + dir_a[:, None, 1] * rel_start[..., 1]
+    )
+    t_end = dir_a[:, None, 0] * rel_end[..., 0] + dir_a[:, None, 1] * rel_end[..., 1]
+    d_start = (
+        dir_a[:, None, 0] * rel_start[..., 1] - dir_a[:, None, 1] * rel_start[..., 0]
+    )
+    d_end = dir_a[:, None, 0] * rel_end[..., 1] - dir_a[:, None, 1] * rel_end[..., 0]
+
+    # b 선분 중 a 선분 [0, len_a] 위로 투영되는 구간만 남긴다.
+    lower = np.clip(np.minimum(t_start, t_end), 0.0, len_a[:, None])
+    upper = np.clip(np.maximum(t_start, t_end), 0.0, len_a[:, None])
+    has_span = upper - lower > tol
+
+    # 잘린 구간 양 끝에서의 거리를 보간해 같은 직선 위에 있는지 판단한다.
+    t_span = np.where(has_span, t_end - t_start, 1.0)
+    slope = (d_end - d_start) / t_span
+    d_lower = d_start + (lower - t_start) * slope
+    d_upper = d_start + (upper - t_start) * slope
+    is_overlap = has_span & (np.abs(d_lower) < tol) & (np.abs(d_upper) < tol)
+
+    # a 선분별로 겹침 구간을 합쳐(union) 중복 없이 길이를 구한다.
+    lower = np.where(is_overlap, lower, 0.0)
+    upper = np.where(is_overlap, upper, 0.0)
+    order = np.argsort(lower, axis=1)
+    lower = np.take_along_axis(lower, order, axis=1)
+    upper = np.take_along_axis(upper, order, axis=1)
+    covered = np.maximum.accumulate(upper, axis=1)
+    covered = np.concatenate([np.zeros((len(len_a), 1)), covered[:, :-1]], axis=1)
+    overlap = np.clip(upper - np.maximum(lower, covered), 0.0, None)
+
+    return float(overlap.sum())
 
 
 def is_intersection_with_other_crvs(crv: geo.Curve, crvs: List[geo.Curve]) -> bool:
+    bbox = get_bbox(crv)
     return any(
-        geo.Curve.PlanarCurveCollision(crv, other_crv, geo.Plane.WorldXY, OP_TOL)
+        not is_bbox_disjoint(bbox, get_bbox(other_crv), OP_TOL)
+        and _has_curve_collision(crv, other_crv, OP_TOL)
         for other_crv in crvs
     )
 
 
+def _has_curve_collision(crv: geo.Curve, other_crv: geo.Curve, tol: float) -> bool:
+    """두 커브의 경계가 서로 닿거나 교차하는지 확인한다.
+    닫힌 커브끼리는 PlanarClosedCurveRelationship을 사용한다.
+    """
+    if crv.IsClosed and other_crv.IsClosed:
+        relationship = geo.Curve.PlanarClosedCurveRelationship(
+            crv, other_crv, geo.Plane.WorldXY, tol
+        )
+        return relationship == geo.RegionContainment.MutualIntersection
+    return geo.Curve.PlanarCurveCollision(crv, other_crv, geo.Plane.WorldXY, tol)
+
+
 def has_region_intersection(
-    region: geo.Curve, other_region: geo.Curve, tol: float = TOL
+    region: geo.Curve,
+    other_region: geo.Curve,
+    tol: float = TOL,
+    use_bbox_filter: bool = True,
 ) -> bool:
     """영역 커브와 다른 영역 커브가 교차하는지 확인한다.
     Args:
         region: 영역 커브
         other_regions: 다른 영역 커브 리스트
         tol: tolerance
+        use_bbox_filter: bounding box 사전 판정 여부
+            (RTree 검색 결과처럼 겹침이 이미 확인된 경우 False)
 
     Returns:
         bool: 교차 여부
     """
+    # bounding box가 떨어져 있으면 정밀 판정 없이 교차가 없다.
+    if use_bbox_filter and is_bbox_disjoint(
+        get_bbox(region), get_bbox(other_region), tol
+    ):
+        return False
+
     relationship = geo.Curve.PlanarClosedCurveRelationship(
         region, other_region, geo.Plane.WorldXY, tol
     )
@@ -132,8 +365,50 @@ def offset_regions_outward(
     """
     if isinstance(regions, geo.Curve):
         regions = [regions]
+    if not regions:
+        return []
+    if not dist:
+        return regions
 
-    return [offset_region_outward(region, dist, miter) for region in regions]
+    # 한 번의 Clipper 호출로 모든 영역을 offset 한다.
+    contours = Offset().polyline_offset(regions, dist, miter).contour
+    matched_contours = _match_offset_contours(regions, contours)
+
+    # offset 결과가 다른 영역과 합쳐진 영역만 따로 offset 한다.
+    return [
+        (contour if contour is not None else offset_region_outward(region, dist, miter))
+        for region, contour in zip(regions, matched_contours)
+    ]
+
+
+def _match_offset_contours(
+    regions: List[geo.Curve], contours: List[geo.Curve]
+) -> List[Optional[geo.Curve]]:
+    """regions 순서에 맞춰 각 영역을 offset한 결과 커브를 찾는다.
+    Clipper는 결과 순서를 보장하지 않고 겹치는 결과를 합치므로,
+    한 영역만 포함하는 결과 커브만 대응시키고 나머지 영역은 None으로 둔다.
+    """
+    contour_bboxes = [get_bbox(contour) for contour in contours]
+    region_owners = [[] for _ in regions]  # type: List[List[int]]
+    contour_members = [[] for _ in contours]  # type: List[List[int]]
+    for i, region in enumerate(regions):
+        pt = region.PointAtStart
+        for j, contour in enumerate(contours):
+            min_x, min_y, max_x, max_y = contour_bboxes[j]
+            if not (min_x <= pt.X <= max_x and min_y <= pt.Y <= max_y):
+                continue
+            containment = contour.Contains(pt, geo.Plane.WorldXY, TOL)
+            if containment == geo.PointContainment.Inside:
+                region_owners[i].append(j)
+                contour_members[j].append(i)
+
+    matched = []  # type: List[Optional[geo.Curve]]
+    for owners in region_owners:
+        if len(owners) == 1 and len(contour_members[owners[0]]) == 1:
+            matched.append(contours[owners[0]])
+        else:
+            matched.append(None)
+    return matched
 
 
 def offset_region_outward(
@@ -156,45 +431,20 @@ def offset_region_outward(
     return Offset().polyline_offset(region, dist, miter).contour[0]
 
 
-def convert_io_to_list(func):
-    """인풋과 아웃풋을 리스트로 만들어주는 데코레이터"""
-
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        new_args = []
-        for arg in args:
-            if isinstance(arg, geo.Curve):
-                arg = [arg]
-            new_args.append(arg)
-
-        result = func(*new_args, **kwargs)
-        if isinstance(result, geo.Curve):
-            result = [result]
-
-        if hasattr(result, "__dict__"):
-            for key, values in result.__dict__.items():
-                if isinstance(values, geo.Curve):
-                    setattr(result, key, [values])
-        return result
-
-    return wrapper
-
-
 class Offset:
     class _PolylineOffsetResult:
         def __init__(self):
             self.contour: Optional[List[geo.Curve]] = None
             self.holes: Optional[List[geo.Curve]] = None
 
-    @convert_io_to_list
     def polyline_offset(
         self,
-        crvs: List[geo.Curve],
-        dists: List[float],
+        crvs: Union[geo.Curve, List[geo.Curve]],
+        dists: Union[float, List[float]],
         miter: int = BIGNUM,
         closed_fillet: int = 2,
         open_fillet: int = 2,
-        tol: float = Rhino.RhinoMath.ZeroTolerance,
+        tol: float = CLIPPER_TOL,
     ) -> _PolylineOffsetResult:
         """
         Args:
@@ -203,10 +453,16 @@ class Offset:
             miter : miter
             closed_fillet : 0 = round, 1 = square, 2 = miter
             open_fillet : 0 = round, 1 = square, 2 = butt
+            tol : Clipper 정수 변환 tolerance. 결과 좌표가 tol 간격 격자에 맞춰지므로
+                겹침 판정 tolerance(TOL)보다 충분히 작아야 offset 결과가 원래 경계 위에 남는다.
 
         Returns:
-            _type_: _PolylineOffsetResult
+            _type_: _PolylineOffsetResult (contour, holes 모두 커브 리스트)
         """
+        if isinstance(crvs, geo.Curve):
+            crvs = [crvs]
+        if not isinstance(dists, (list, tuple)):
+            dists = [dists]
         if not crvs:
             raise ValueError("No Curves to offset")
 
@@ -223,5 +479,8 @@ class Offset:
 
         polyline_offset_result = Offset._PolylineOffsetResult()
         for name in ("contour", "holes"):
-            setattr(polyline_offset_result, name, result[name])
+            values = result[name]
+            if isinstance(values, geo.Curve):
+                values = [values]
+            setattr(polyline_offset_result, name, list(values or []))
         return polyline_offset_result